@@ -1,3 +1,9 @@
+import bisect
+import math
+import time
+from collections import deque
+
+
 class Point:
     """
     Represents a point in a two-dimensional space.
@@ -17,6 +23,79 @@ class Point:
         return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
 
 
+class Metric:
+    """
+    A distance function on the plane, together with the bounds the combine step
+    needs to prune candidates.
+
+    Attributes:
+        name (str): A human readable name for the metric.
+        wx (float): The weight applied to differences along the x-axis.
+        wy (float): The weight applied to differences along the y-axis.
+        p (float): The order of the weighted norm (1, 2 or float("inf")).
+    """
+
+    def __init__(self, name, p, wx=1, wy=1):
+        if p not in (1, 2, float("inf")):
+            raise ValueError("Only norms of order 1, 2 and inf are supported")
+        if wx <= 0 or wy <= 0:
+            raise ValueError("Metric weights must be positive")
+        self.name = name
+        self.p = p
+        self.wx = wx
+        self.wy = wy
+
+    def __repr__(self):
+        return f"Metric({self.name})"
+
+    def __call__(self, a, b):
+        """
+        Returns the distance between points a and b under this metric.
+        """
+        dx = self.wx * abs(a.x - b.x)
+        dy = self.wy * abs(a.y - b.y)
+        if self.p == 1:
+            return dx + dy
+        if self.p == 2:
+            return (dx**2 + dy**2) ** 0.5
+        return max(dx, dy)
+
+    def x_reach(self, d):
+        """
+        Returns the largest horizontal offset two points at distance at most d can have.
+
+        Every weighted norm of order p >= 1 is at least the weighted difference of
+        any single coordinate, so this is the half-width of the strip.
+        """
+        return d / self.wx
+
+    def y_reach(self, d):
+        """
+        Returns the largest vertical offset two points at distance at most d can have.
+        """
+        return d / self.wy
+
+
+EUCLIDEAN = Metric("euclidean", 2)
+MANHATTAN = Metric("manhattan", 1)
+CHEBYSHEV = Metric("chebyshev", float("inf"))
+
+
+def weighted(wx, wy, p=2):
+    """
+    Builds a metric that scales the x and y differences before applying the norm.
+
+    Args:
+        wx (float): The weight of the x-axis.
+        wy (float): The weight of the y-axis.
+        p (float): The order of the norm, 1, 2 or float("inf") (default: 2).
+
+    Returns:
+        Metric: The weighted metric.
+    """
+    return Metric(f"weighted-l{p}({wx}, {wy})", p, wx, wy)
+
+
 current_state = {
     "vertical": [],
     "closest": [],
@@ -25,16 +104,18 @@ current_state = {
     "second": None,
     "curr": None,
     "strip": None,
+    "strip_y": None,
     "return": None,
 }
 
 
-def closest_pair(points):
+def closest_pair(points, metric=EUCLIDEAN):
     """
     Finds the closest pair of points in a given list of points, step by step.
 
     Args:
         points (list): A list of points.
+        metric (Metric): The metric used to measure distances (default: EUCLIDEAN).
 
     Yields:
         dict: The current state of the algorithm, including the closest pair of points found so far.
@@ -56,13 +137,13 @@ def closest_pair(points):
         mid = len(points) // 2 - 1
         current_state["vertical"].append((points[mid], -1))
         yield current_state
-        yield from closest_pair(points[: mid + 1])
+        yield from closest_pair(points[: mid + 1], metric)
         left_pair = current_state["return"]
 
         current_state["vertical"].pop()
         current_state["vertical"].append((points[mid], 1))
         yield current_state
-        yield from closest_pair(points[mid + 1 :])
+        yield from closest_pair(points[mid + 1 :], metric)
         right_pair = current_state["return"]
 
         current_state["vertical"].pop()
@@ -75,23 +156,25 @@ def closest_pair(points):
         current_state["combine"] = True
         median_x = points[mid].x
         if left_pair is None:
-            min_distance = right_pair[0].distance(right_pair[1])
+            min_distance = metric(right_pair[0], right_pair[1])
             current_state["closest"].append(right_pair)
         else:
-            if left_pair[0].distance(left_pair[1]) < right_pair[0].distance(
-                right_pair[1]
+            if metric(left_pair[0], left_pair[1]) < metric(
+                right_pair[0], right_pair[1]
             ):
-                min_distance = left_pair[0].distance(left_pair[1])
+                min_distance = metric(left_pair[0], left_pair[1])
                 current_state["closest"].append(left_pair)
             else:
-                min_distance = right_pair[0].distance(right_pair[1])
+                min_distance = metric(right_pair[0], right_pair[1])
                 current_state["closest"].append(right_pair)
 
-        current_state["strip"] = min_distance
+        current_state["strip"] = metric.x_reach(min_distance)
+        current_state["strip_y"] = metric.y_reach(min_distance)
 
         combine_pair = (Point(0, 0), Point(1200, 560))
-        left_strip = [p for p in points[0 : mid + 1] if p.x >= median_x - min_distance]
-        right_strip = [p for p in points[mid + 1 :] if p.x <= median_x + min_distance]
+        x_reach = metric.x_reach(min_distance)
+        left_strip = [p for p in points[0 : mid + 1] if p.x >= median_x - x_reach]
+        right_strip = [p for p in points[mid + 1 :] if p.x <= median_x + x_reach]
 
         left_strip = sorted(left_strip, key=lambda p: p.y)
         right_strip = sorted(right_strip, key=lambda p: p.y)
@@ -100,19 +183,21 @@ def closest_pair(points):
 
         initial_right = 0
         for left_point in left_strip:
-            if left_point.x < median_x - min_distance:
+            x_reach = metric.x_reach(min_distance)
+            y_reach = metric.y_reach(min_distance)
+            if left_point.x < median_x - x_reach:
                 continue
 
             while (
                 initial_right < len(right_strip)
-                and right_strip[initial_right].y < left_point.y - min_distance
+                and right_strip[initial_right].y < left_point.y - y_reach
             ):
                 initial_right += 1
 
             final_right = initial_right
             while (
                 final_right < len(right_strip)
-                and right_strip[final_right].y <= left_point.y + min_distance
+                and right_strip[final_right].y <= left_point.y + y_reach
             ):
                 final_right += 1
 
@@ -121,22 +206,23 @@ def closest_pair(points):
             yield current_state
 
             for right in range(initial_right, final_right):
-                if right_strip[right].x > median_x + min_distance:
+                if right_strip[right].x > median_x + x_reach:
                     continue
 
                 current_state["second"] = right_strip[right]
                 yield current_state
 
-                if left_point.distance(right_strip[right]) < min_distance:
-                    min_distance = left_point.distance(right_strip[right])
+                if metric(left_point, right_strip[right]) < min_distance:
+                    min_distance = metric(left_point, right_strip[right])
                     combine_pair = (left_point, right_strip[right])
                     current_state["curr"] = (left_point, right_strip[right])
-                    current_state["strip"] = min_distance
+                    current_state["strip"] = metric.x_reach(min_distance)
+                    current_state["strip_y"] = metric.y_reach(min_distance)
                     yield current_state
 
         if left_pair is None:
             return_pair = min(
-                [right_pair, combine_pair], key=lambda p: p[0].distance(p[1])
+                [right_pair, combine_pair], key=lambda p: metric(p[0], p[1])
             )
             if return_pair == combine_pair:
                 current_state["closest"].pop()
@@ -146,7 +232,7 @@ def closest_pair(points):
             yield current_state
         else:
             return_pair = min(
-                [left_pair, right_pair, combine_pair], key=lambda p: p[0].distance(p[1])
+                [left_pair, right_pair, combine_pair], key=lambda p: metric(p[0], p[1])
             )
             if return_pair == combine_pair:
                 current_state["closest"].pop()
@@ -159,6 +245,503 @@ def closest_pair(points):
         current_state["combine"] = False
 
 
+# The offsets of a grid cell and the eight cells around it
+NEIGHBOURS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+
+def coarse_cell_size(points, metric=EUCLIDEAN):
+    """
+    Returns a cell size for which a grid holds about one point per cell.
+
+    Args:
+        points (list): A list of at least two points.
+        metric (Metric): The metric used to measure distances (default: EUCLIDEAN).
+
+    Returns:
+        float: The cell size, measured in the metric.
+    """
+    xs = [point.x for point in points]
+    ys = [point.y for point in points]
+    span_x = metric.wx * (max(xs) - min(xs))
+    span_y = metric.wy * (max(ys) - min(ys))
+    if span_x > 0 and span_y > 0:
+        return (span_x * span_y / len(points)) ** 0.5
+    if span_x > 0 or span_y > 0:
+        return max(span_x, span_y) / len(points)
+    return 1
+
+
+def anytime_closest_pair(points, budget=None, metric=EUCLIDEAN, levels=4):
+    """
+    Finds the closest pair of points, yielding improving answers until time runs out.
+
+    The first two points are yielded straight away. A coarse grid with about one
+    point per cell then gives a candidate pair in linear time, by comparing each
+    point with the previous point of its cell. Any pair closer than the cell size
+    of a grid lies in the same or in adjacent cells, so a full pass over a grid
+    whose cells are as large as the candidate distance proves the answer exact.
+    Before that pass, one pass with cells `levels` halvings smaller proves an
+    early lower bound. If the candidate is poor either pass can get crowded, so
+    it is abandoned in favour of grids whose cells double in size from the last
+    proven lower bound; each of those passes proves its cell size is a lower bound.
+
+    Args:
+        points (list): A list of points, in any order.
+        budget (float): The number of seconds to spend, or None to run until exact.
+        metric (Metric): The metric used to measure distances (default: EUCLIDEAN).
+        levels (int): How many times to halve the upper bound for the fallback grids
+            (default: 4).
+
+    Yields:
+        dict: The best pair found so far ("pair"), its distance ("upper"), a proven
+        lower bound on the closest distance ("lower") and whether they match ("exact").
+    """
+    deadline = None if budget is None else time.monotonic() + budget
+
+    if len(points) < 2:
+        yield {
+            "pair": None,
+            "upper": float("inf"),
+            "lower": float("inf"),
+            "exact": True,
+        }
+        return
+
+    best_pair = (points[0], points[1])
+    upper = metric(points[0], points[1])
+    lower = 0
+
+    def state():
+        return {
+            "pair": best_pair,
+            "upper": upper,
+            "lower": lower,
+            "exact": lower == upper,
+        }
+
+    def timed_out():
+        return deadline is not None and time.monotonic() > deadline
+
+    yield state()
+    if upper == 0:
+        return
+
+    def grid_pass(size, limit=None):
+        """
+        Compares every point with the points in its own and adjacent cells.
+
+        Returns True once every pair closer than size has been compared, or False
+        if the deadline or the limit on the number of comparisons was reached.
+        """
+        nonlocal best_pair, upper
+        width = metric.x_reach(size)
+        height = metric.y_reach(size)
+        grid = {}
+        compared = 0
+        for i, point in enumerate(points):
+            if i % 256 == 0 and (
+                timed_out() or (limit is not None and compared > limit)
+            ):
+                return False
+            cell_x = int(point.x // width)
+            cell_y = int(point.y // height)
+            for dx, dy in NEIGHBOURS:
+                cell = grid.get((cell_x + dx, cell_y + dy))
+                if cell is None:
+                    continue
+                compared += len(cell)
+                for other in cell:
+                    distance = metric(point, other)
+                    if distance < upper:
+                        upper = distance
+                        best_pair = (point, other)
+                        yield state()
+            grid.setdefault((cell_x, cell_y), []).append(point)
+        return True
+
+    # Candidate phase
+    if timed_out():
+        return
+    size = coarse_cell_size(points, metric)
+    width = metric.x_reach(size)
+    height = metric.y_reach(size)
+    last = {}
+    for i, point in enumerate(points):
+        if i % 256 == 0 and timed_out():
+            break
+        cell = (int(point.x // width), int(point.y // height))
+        other = last.get(cell)
+        if other is not None:
+            distance = metric(point, other)
+            if distance < upper:
+                upper = distance
+                best_pair = (other, point)
+        last[cell] = point
+    yield state()
+    if upper == 0 or timed_out():
+        return
+
+    # A fine pass is cheap on spread out points and gives an early lower bound
+    size = upper / 2**levels
+    if (yield from grid_pass(size, 16 * len(points))):
+        lower = min(size, upper)
+        yield state()
+        if lower == upper:
+            return
+        size *= 2
+    elif timed_out():
+        return
+
+    # A good candidate is proven in a single pass
+    if (yield from grid_pass(upper, 16 * len(points))):
+        lower = upper
+        yield state()
+        return
+    if timed_out():
+        return
+
+    while True:
+        if not (yield from grid_pass(size)):
+            return
+
+        # Every pair closer than size has now been compared
+        lower = min(size, upper)
+        yield state()
+        if lower == upper:
+            return
+        size = min(2 * size, upper)
+
+
+def closest_pair_within(points, budget, metric=EUCLIDEAN, levels=4):
+    """
+    Returns the best answer `anytime_closest_pair` reaches within a time budget.
+
+    Args:
+        points (list): A list of points, in any order.
+        budget (float): The number of seconds to spend, or None to run until exact.
+        metric (Metric): The metric used to measure distances (default: EUCLIDEAN).
+        levels (int): How many times to halve the upper bound for the fallback grids
+            (default: 4).
+
+    Returns:
+        dict: The last state yielded by `anytime_closest_pair`.
+    """
+    state = None
+    for state in anytime_closest_pair(points, budget, metric, levels):
+        pass
+    return state
+
+
+class GrowingClosestPair:
+    """
+    Keeps the closest pair of a set of points that only grows.
+
+    Points are bucketed into a grid whose cells are at least as large as the
+    closest distance, so a new point only needs to be compared with the points
+    in its own and adjacent cells. The grid is rebuilt whenever the closest
+    distance drops below half the cell size.
+
+    Attributes:
+        metric (Metric): The metric used to measure distances.
+        pair (tuple): The closest pair of points, or None.
+        distance (float): The distance between the closest pair of points.
+    """
+
+    def __init__(self, metric=EUCLIDEAN):
+        self.metric = metric
+        self.points = []
+        self.pair = None
+        self.distance = float("inf")
+        self.grid = None
+        self.cell_distance = None
+
+    def cell(self, point):
+        """
+        Returns the grid cell containing the given point.
+        """
+        return (
+            int(point.x // self.metric.x_reach(self.cell_distance)),
+            int(point.y // self.metric.y_reach(self.cell_distance)),
+        )
+
+    def rebuild(self):
+        """
+        Rebuilds the grid with cells as large as the closest distance.
+        """
+        self.grid = None
+        if self.distance == 0:
+            return
+        self.cell_distance = self.distance
+        self.grid = {}
+        for point in self.points:
+            self.grid.setdefault(self.cell(point), []).append(point)
+
+    def add(self, point):
+        """
+        Adds a point and returns the new closest distance.
+        """
+        self.points.append(point)
+        if len(self.points) == 2:
+            self.pair = (self.points[0], point)
+            self.distance = self.metric(self.points[0], point)
+            self.rebuild()
+        elif self.grid is not None:
+            cell_x, cell_y = self.cell(point)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for other in self.grid.get((cell_x + dx, cell_y + dy), ()):
+                        distance = self.metric(point, other)
+                        if distance < self.distance:
+                            self.distance = distance
+                            self.pair = (other, point)
+            self.grid.setdefault((cell_x, cell_y), []).append(point)
+            if self.distance < self.cell_distance / 2:
+                self.rebuild()
+        return self.distance
+
+
+class SlidingClosestPair:
+    """
+    Keeps the closest pair of points among the most recent points of a stream.
+
+    The window holds the last `size` points, the points of the last `duration`
+    seconds, or both. The points are split into two blocks. The old block holds
+    the oldest points of the window; when it was sealed, the closest pair of each
+    of its suffixes was computed by adding its points newest first to a
+    `GrowingClosestPair`. The new block holds every later point and keeps its
+    closest pair in another `GrowingClosestPair`. When the last point of the old
+    block expires, the new block is sealed and becomes the old block.
+
+    A pair across the blocks can only be the answer while it is closer than the
+    closest pair of the new block, so each arrival is compared with the old points
+    within that distance. These cross pairs are kept ordered by the expiry of
+    their older point, dropping any pair that expires no later than a closer one,
+    so their distances increase and the closest live one is always at the front.
+
+    The old points are found with grids over the old block whose cells double in
+    size, starting from its closest distance, so the finest cells hold a constant
+    number of points however the points are spread. The grids are only built
+    when first needed, and a search looks at the nine cells around the arrival in
+    the first grid whose cells are at least as large as the new block's closest
+    distance. An arrival therefore visits the old points within about three times
+    that distance, which on spread out and on clustered points alike is a
+    constant number on average. The search scans the whole old block only while
+    the new block has fewer than two points; it visits many points only when the
+    new block is much sparser than the old block in the same region.
+
+    Attributes:
+        size (int): The maximum number of points in the window, or None.
+        duration (float): The maximum age of a point in the window, or None.
+        metric (Metric): The metric used to measure distances.
+        pair (tuple): The closest pair of points in the window, or None.
+        distance (float): The distance between the closest pair of points.
+    """
+
+    def __init__(self, size=None, duration=None, metric=EUCLIDEAN):
+        if size is None and duration is None:
+            raise ValueError("Either size or duration must be given")
+        if size is not None and size < 2:
+            raise ValueError("The window must hold at least two points")
+        if duration is not None and duration <= 0:
+            raise ValueError("The window duration must be positive")
+        self.size = size
+        self.duration = duration
+        self.metric = metric
+        self.window = deque()
+        self.count = 0
+        self.pair = None
+        self.distance = float("inf")
+
+        self.old = []
+        self.old_suffixes = []
+        self.old_grids = {}
+        self.old_cells = []
+        self.old_base = None
+        self.new = []
+        self.new_pair = GrowingClosestPair(metric)
+        self.cross_expiries = []
+        self.cross_pairs = []
+
+    def expire(self, timestamp):
+        """
+        Removes the points that fall out of the window at the given time.
+        """
+        while (self.size is not None and len(self.window) > self.size) or (
+            self.duration is not None
+            and self.window[0][1] <= timestamp - self.duration
+        ):
+            self.window.popleft()
+
+    def seal(self, start):
+        """
+        Turns the new block into the old block, keeping the points from index start.
+        """
+        self.old = [entry for entry in self.new if entry[0] >= start]
+        self.new = []
+        self.new_pair = GrowingClosestPair(self.metric)
+        self.cross_expiries = []
+        self.cross_pairs = []
+
+        suffix_pair = GrowingClosestPair(self.metric)
+        self.old_suffixes = [None] * len(self.old)
+        for i in range(len(self.old) - 1, -1, -1):
+            suffix_pair.add(self.old[i][2])
+            self.old_suffixes[i] = (suffix_pair.distance, suffix_pair.pair)
+
+        # Cells of the finest grid are as large as the closest distance of the
+        # block, so each of them holds a constant number of its points
+        self.old_grids = {}
+        self.old_cells = []
+        if len(self.old) >= 2:
+            positive = [d for d, _ in self.old_suffixes if 0 < d < float("inf")]
+            if positive:
+                self.old_base = min(positive)
+            else:
+                points = [point for _, _, point in self.old]
+                self.old_base = coarse_cell_size(points, self.metric)
+            self.old_cells = [self.old_cell(entry[2]) for entry in self.old]
+
+    def old_cell(self, point):
+        """
+        Returns the cell containing the given point in the finest old block grid.
+        """
+        return (
+            int(point.x // self.metric.x_reach(self.old_base)),
+            int(point.y // self.metric.y_reach(self.old_base)),
+        )
+
+    def old_grid(self, level):
+        """
+        Returns the grid of the old block whose cells are 2**level times as large
+        as the finest ones, building it the first time it is needed.
+
+        A cell of a coarser grid is found by shifting the cell of the finest grid,
+        so every grid splits the plane along the same lines.
+        """
+        if level not in self.old_grids:
+            grid = {}
+            for i, (cell_x, cell_y) in enumerate(self.old_cells):
+                grid.setdefault((cell_x >> level, cell_y >> level), []).append(i)
+            self.old_grids[level] = grid
+        return self.old_grids[level]
+
+    def old_neighbours(self, point, radius, first):
+        """
+        Returns the positions in the old block, from first on, of the points
+        closer than radius to the given point, together with their distances.
+        """
+        if radius == 0:
+            return []
+        if radius == float("inf") or len(self.old) < 2:
+            positions = range(first, len(self.old))
+        else:
+            # Use the finest grid whose cells are at least as large as radius
+            level = max(0, math.ceil(math.log2(radius / self.old_base)))
+            grid = self.old_grid(level)
+            cell_x, cell_y = self.old_cell(point)
+            cell_x >>= level
+            cell_y >>= level
+            positions = [
+                i
+                for dx, dy in NEIGHBOURS
+                for i in grid.get((cell_x + dx, cell_y + dy), ())
+                if i >= first
+            ]
+        neighbours = []
+        for i in positions:
+            distance = self.metric(point, self.old[i][2])
+            if distance < radius:
+                neighbours.append((i, distance))
+        return neighbours
+
+    def add_cross_pair(self, expiry, distance, pair):
+        """
+        Records a pair across the blocks unless one expiring no earlier is closer.
+        """
+        position = bisect.bisect_left(self.cross_expiries, expiry)
+        if (
+            position < len(self.cross_pairs)
+            and self.cross_pairs[position][0] <= distance
+        ):
+            return
+        end = position
+        if end < len(self.cross_pairs) and self.cross_expiries[end] == expiry:
+            end += 1
+        start = position
+        while start > 0 and self.cross_pairs[start - 1][0] >= distance:
+            start -= 1
+        self.cross_expiries[start:end] = [expiry]
+        self.cross_pairs[start:end] = [(distance, pair)]
+
+    def add(self, timestamp, point):
+        """
+        Adds a point to the window and returns the closest pair of the window.
+
+        Args:
+            timestamp (float): The arrival time, no earlier than the previous one.
+            point (Point): The new point.
+
+        Returns:
+            dict: The arrival time ("time"), the closest pair of points in the window
+            ("pair") and their distance ("distance").
+        """
+        entry = (self.count, timestamp, point)
+        self.count += 1
+        self.window.append(entry)
+        self.expire(timestamp)
+        start = self.window[0][0]
+
+        if not self.old or self.old[-1][0] < start:
+            self.seal(start)
+        first = 0
+        if self.old:
+            first = max(0, start - self.old[0][0])
+
+        self.new.append(entry)
+        radius = self.new_pair.add(point)
+
+        # Of the old points closer than radius, only those closer than every
+        # newer one can be the answer
+        best = float("inf")
+        for i, distance in sorted(
+            self.old_neighbours(point, radius, first), reverse=True
+        ):
+            if distance < best:
+                best = distance
+                self.add_cross_pair(self.old[i][0], distance, (self.old[i][2], point))
+
+        expired = bisect.bisect_left(self.cross_expiries, start)
+        del self.cross_expiries[:expired]
+        del self.cross_pairs[:expired]
+
+        candidates = [(self.new_pair.distance, self.new_pair.pair)]
+        if first < len(self.old):
+            candidates.append(self.old_suffixes[first])
+        if self.cross_pairs:
+            candidates.append(self.cross_pairs[0])
+        self.distance, self.pair = min(candidates, key=lambda c: c[0])
+        return {"time": timestamp, "pair": self.pair, "distance": self.distance}
+
+
+def sliding_closest_pair(stream, size=None, duration=None, metric=EUCLIDEAN):
+    """
+    Finds the closest pair of points in a sliding window over a stream of points.
+
+    Args:
+        stream (iterable): Pairs (timestamp, point) in non-decreasing timestamp order.
+        size (int): The number of most recent points in the window, or None.
+        duration (float): How many seconds a point stays in the window, or None.
+        metric (Metric): The metric used to measure distances (default: EUCLIDEAN).
+
+    Yields:
+        dict: The closest pair of the window after each arrival, as returned by
+        `SlidingClosestPair.add`.
+    """
+    window = SlidingClosestPair(size, duration, metric)
+    for timestamp, point in stream:
+        yield window.add(timestamp, point)
+
+
 if __name__ == "__main__":
     points = [
         Point(100, 100),
@@ -123,6 +123,7 @@ if __name__ == "__main__":
         "second": None,
         "curr": None,
         "strip": None,
+        "strip_y": None,
         "return": None,
     }
 
@@ -187,6 +188,7 @@ if __name__ == "__main__":
                         "second": None,
                         "curr": None,
                         "strip": None,
+                        "strip_y": None,
                         "return": None,
                     }
                     gen = algorithm.closest_pair(points)
@@ -198,6 +200,7 @@ if __name__ == "__main__":
                         "second": None,
                         "curr": None,
                         "strip": None,
+                        "strip_y": None,
                         "return": None,
                     }
                     STATE = "stop"
@@ -223,6 +226,7 @@ if __name__ == "__main__":
                         "second": None,
                         "curr": None,
                         "strip": None,
+                        "strip_y": None,
                         "return": None,
                     }
                     gen = algorithm.closest_pair(points)
@@ -234,6 +238,7 @@ if __name__ == "__main__":
                         "second": None,
                         "curr": None,
                         "strip": None,
+                        "strip_y": None,
                         "return": None,
                     }
                     STATE = "stop"
@@ -256,6 +261,7 @@ if __name__ == "__main__":
                             "second": None,
                             "curr": None,
                             "strip": None,
+                            "strip_y": None,
                             "return": None,
                         }
                         clock.tick(10)
@@ -277,6 +283,7 @@ if __name__ == "__main__":
                     "second": None,
                     "curr": None,
                     "strip": None,
+                    "strip_y": None,
                     "return": None,
                 }
                 STATE = "stop"
@@ -295,6 +302,7 @@ if __name__ == "__main__":
                         "second": None,
                         "curr": None,
                         "strip": None,
+                        "strip_y": None,
                         "return": None,
                     }
                 STEP = False
@@ -87,6 +87,7 @@ def draw_state(win, dict):
     - "second" (Point): The second point currently being considered against the base point.
     - "curr" (tuple): A tuple containing two points (point1, point2) to be connected by a line, the current closest pair of points in the combine step.
     - "strip" (int): The radius of the strip to be drawn around the last vertical line.
+    - "strip_y" (int): The vertical radius of the window drawn around the base point.
 
     Note:
     - The function assumes that the pygame module has been imported.
@@ -101,7 +102,8 @@ def draw_state(win, dict):
         "base": Point(100, 200),
         "second": Point(300, 400),
         "curr": (Point(500, 600), Point(700, 800)),
-        "strip": 50
+        "strip": 50,
+        "strip_y": 50
     }
     draw_state(window_surface, state)
     ```
@@ -147,11 +149,11 @@ def draw_state(win, dict):
                 "black",
                 (
                     dict["vertical"][-1][0].x - dict["strip"],
-                    dict["base"].y - dict["strip"],
+                    dict["base"].y - dict["strip_y"],
                 ),
                 (
                     dict["vertical"][-1][0].x + dict["strip"],
-                    dict["base"].y - dict["strip"],
+                    dict["base"].y - dict["strip_y"],
                 ),
                 1,
             )
@@ -160,11 +162,11 @@ def draw_state(win, dict):
                 "black",
                 (
                     dict["vertical"][-1][0].x - dict["strip"],
-                    dict["base"].y + dict["strip"],
+                    dict["base"].y + dict["strip_y"],
                 ),
                 (
                     dict["vertical"][-1][0].x + dict["strip"],
-                    dict["base"].y + dict["strip"],
+                    dict["base"].y + dict["strip_y"],
                 ),
                 1,
             )
@@ -196,6 +198,7 @@ if __name__ == "__main__":
         "second": Point(150, 175),
         "curr": (Point(100, 150), Point(100, 175)),
         "strip": 10,
+        "strip_y": 10,
     }
 
     sample_points = [
@@ -0,0 +1,166 @@
+import itertools
+import random
+
+import pytest
+
+import algorithm
+from algorithm import Point
+
+METRICS = [
+    algorithm.EUCLIDEAN,
+    algorithm.MANHATTAN,
+    algorithm.CHEBYSHEV,
+    algorithm.weighted(2, 0.5),
+    algorithm.weighted(0.3, 3, 1),
+    algorithm.weighted(1, 4, float("inf")),
+]
+
+
+def brute_force(points, metric):
+    """
+    Returns the closest distance among the given points by comparing every pair.
+    """
+    if len(points) < 2:
+        return float("inf")
+    return min(metric(a, b) for a, b in itertools.combinations(points, 2))
+
+
+def random_points(rng, n, kind):
+    """
+    Returns n random points spread out, on a small lattice with repeats, in a
+    cluster with a few far away outliers, or along a line with growing gaps.
+    """
+    if kind == "spread":
+        return [Point(rng.uniform(0, 300), rng.randint(0, 300)) for _ in range(n)]
+    if kind == "lattice":
+        return [Point(rng.randint(0, 3), rng.randint(0, 3)) for _ in range(n)]
+    if kind == "outliers":
+        return [
+            Point(rng.uniform(0, 1e6), rng.uniform(0, 1e6))
+            if rng.random() < 0.02
+            else Point(rng.random(), rng.random())
+            for _ in range(n)
+        ]
+    return [Point(i * i * 1e-3, 0) for i in range(n)]
+
+
+def run_closest_pair(points, metric):
+    """
+    Runs the step by step closest_pair to completion and returns its final pair.
+    """
+    algorithm.current_state = {
+        "vertical": [],
+        "closest": [],
+        "combine": False,
+        "base": None,
+        "second": None,
+        "curr": None,
+        "strip": None,
+        "strip_y": None,
+        "return": None,
+    }
+    for _ in algorithm.closest_pair(points, metric):
+        pass
+    return algorithm.current_state["return"]
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("kind", ["spread", "lattice", "line"])
+def test_closest_pair_matches_brute_force(metric, kind):
+    rng = random.Random(0)
+    for _ in range(50):
+        points = random_points(rng, rng.randint(1, 40), kind)
+        points = sorted(points, key=lambda p: p.x)
+        pair = run_closest_pair(points, metric)
+        if len(points) == 1:
+            assert pair is None
+        else:
+            assert metric(*pair) == pytest.approx(brute_force(points, metric))
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("kind", ["spread", "lattice", "line"])
+def test_closest_pair_within_matches_brute_force(metric, kind):
+    rng = random.Random(0)
+    for _ in range(50):
+        points = random_points(rng, rng.randint(0, 40), kind)
+        state = algorithm.closest_pair_within(points, None, metric)
+        expected = brute_force(points, metric)
+        assert state["exact"]
+        assert state["lower"] == state["upper"]
+        assert state["upper"] == pytest.approx(expected)
+        if state["pair"] is not None:
+            assert metric(*state["pair"]) == pytest.approx(expected)
+
+
+def test_anytime_closest_pair_proves_a_lower_bound_before_the_answer():
+    rng = random.Random(0)
+    points = [Point(rng.random(), rng.random()) for _ in range(20000)]
+    expected = algorithm.closest_pair_within(points, None)["upper"]
+
+    states = list(algorithm.anytime_closest_pair(points))
+    assert any(0 < state["lower"] < state["upper"] for state in states)
+
+    state = algorithm.closest_pair_within(points, 1.0)
+    assert 0 < state["lower"] <= expected <= state["upper"]
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("kind", ["spread", "lattice", "outliers", "line"])
+@pytest.mark.parametrize(
+    "size, duration", [(2, None), (10, None), (None, 1.0), (25, 5.0)]
+)
+def test_sliding_closest_pair_matches_brute_force(metric, kind, size, duration):
+    rng = random.Random(0)
+    points = random_points(rng, 150, kind)
+    timestamp = 0
+    stream = []
+    for point in points:
+        timestamp += rng.choice([0, 0.1, 0.5, 1.5])
+        stream.append((timestamp, point))
+
+    for i, state in enumerate(
+        algorithm.sliding_closest_pair(stream, size, duration, metric)
+    ):
+        window = [
+            point
+            for time, point in stream[: i + 1]
+            if duration is None or time > state["time"] - duration
+        ]
+        if size is not None:
+            window = window[-size:]
+        expected = brute_force(window, metric)
+        assert state["distance"] == pytest.approx(expected)
+        if state["pair"] is not None:
+            assert metric(*state["pair"]) == pytest.approx(expected)
+            assert all(any(p is q for q in window) for p in state["pair"])
+
+
+class CountingMetric(algorithm.Metric):
+    """
+    A metric that counts how many distances it has measured.
+    """
+
+    calls = 0
+
+    def __call__(self, a, b):
+        self.calls += 1
+        return super().__call__(a, b)
+
+
+def test_sliding_closest_pair_work_does_not_grow_with_outliers():
+    rng = random.Random(0)
+    points = random_points(rng, 20000, "outliers")
+    metric = CountingMetric("counting", 2)
+    for _ in algorithm.sliding_closest_pair(enumerate(points), 2000, None, metric):
+        pass
+    assert metric.calls / len(points) < 50
+
+
+def test_sliding_closest_pair_rejects_empty_windows():
+    with pytest.raises(ValueError):
+        algorithm.SlidingClosestPair()
+    with pytest.raises(ValueError):
+        algorithm.SlidingClosestPair(size=1)
+    with pytest.raises(ValueError):
+        algorithm.SlidingClosestPair(duration=0)